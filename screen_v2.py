@@ -14,7 +14,7 @@ What it does
 - Adds Simons quant-edge anomaly metrics (autocorr, vol clustering, return predictability)
 - Optionally merges patents/IP signals from patents.csv
 - Builds sub-scores per “legendary” investor and a combined meta-score
-- Writes CSV + Markdown summaries
+- Writes Parquet (CSV with --csv) + Markdown summaries
 
 Notes
 -----
@@ -23,50 +23,98 @@ Notes
 - Educational research tool. Not investment advice.
 """
 
-import os, json, warnings, datetime as dt
+import os, sys, json, asyncio, warnings, datetime as dt
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np, pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 import yfinance as yf
-
-warnings.filterwarnings("ignore")
+from requests_cache import CachedSession
 
 OUT_DIR = "outputs"
 os.makedirs(OUT_DIR, exist_ok=True)
 
-# ------------------------- Helper functions -------------------------
+# Max tickers in flight at once during the fetch stage
+CONCURRENCY_LIMIT = 16
 
-def safe_div(a, b):
+# Disk-backed HTTP cache so reruns (e.g. while tuning score weights) skip the
+# network entirely. Prices stay fresh (60s); fundamentals are fine for a day.
+session = CachedSession(".yf_cache", backend="sqlite", expire_after=3600,
+                        urls_expire_after={
+                            "*/v8/finance/chart/*": 60,
+                            "*/v10/finance/quoteSummary/*": 86400,
+                            "*/ws/fundamentals-timeseries/*": 86400,
+                        })
+
+# ------------------------- Helper functions -------------------------
+# Scalar helpers are JIT-compiled with numba: they run hundreds of times per
+# ticker and are pure float math, so skipping Python dispatch pays off once
+# I/O is cached. Callers coerce pandas/info values to float via as_float first.
+
+try:
+    from numba import njit
+except ImportError:
+    # numba missing: fall back to plain Python, same signatures
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+def as_float(x):
+    """Coerce a pandas/info value (None, numpy scalar, str) to float once."""
     try:
-        a = float(a); b = float(b)
-        if b == 0 or np.isnan(b): return np.nan
-        return a / b
-    except Exception:
+        return float(x)
+    except (TypeError, ValueError):
         return np.nan
 
-def cagr(first, last, years):
-    try:
-        if first is None or last is None or first <= 0 or years <= 0:
-            return np.nan
-        return (last / first) ** (1/years) - 1
-    except Exception:
+def stmt_arrays(stmt):
+    """Statement DataFrame -> {row label: numpy values}. {} when missing/empty.
+    A dict of arrays makes the ~15 per-ticker line lookups plain hash probes
+    instead of .loc chains with throwaway Series defaults."""
+    if stmt is None or getattr(stmt, "empty", True):
+        return {}
+    return {str(k): stmt.loc[k].to_numpy() for k in stmt.index}
+
+def stmt_val(d, key, i=0):
+    """i-th period of a statement line as float; NaN when absent or too short."""
+    arr = d.get(key)
+    if arr is None or len(arr) <= i:
+        return np.nan
+    return as_float(arr[i])
+
+@njit(cache=True)
+def safe_div(a, b):
+    if b == 0.0 or np.isnan(b) or np.isnan(a):
         return np.nan
+    return a / b
 
+@njit(cache=True)
 def pct_change(a, b):
-    try:
-        return (b - a) / abs(a) if a not in (0, None, np.nan) else np.nan
-    except Exception:
+    if np.isnan(a) or np.isnan(b) or a == 0.0:
         return np.nan
+    return (b - a) / abs(a)
 
-def series_autocorr(s, lag=1):
-    s = pd.Series(s).dropna()
-    if len(s) <= lag+1: return np.nan
-    return s.autocorr(lag=lag)
+@njit(cache=True)
+def invested_cap(ta, cl, cash, sti, gw, inta):
+    if np.isnan(ta) and np.isnan(cl):
+        return np.nan
+    # Conservative operating IC: TA - CL - (Cash+STI) - (Goodwill+Intangibles)
+    cashlike = (0.0 if np.isnan(cash) else cash) + (0.0 if np.isnan(sti) else sti)
+    soft = (0.0 if np.isnan(gw) else gw) + (0.0 if np.isnan(inta) else inta)
+    return (ta - cl) - cashlike - soft
 
-def load_optional_csv(path, index_col="ticker"):
+def load_optional_csv(path, index_col="ticker", column_types=None):
+    # Arrow's multithreaded reader; an explicit schema skips type inference
     if os.path.exists(path):
         try:
-            df = pd.read_csv(path)
+            opts = pacsv.ConvertOptions(column_types=column_types or {})
+            df = pacsv.read_csv(path, convert_options=opts).to_pandas()
             if index_col in df.columns:
+                # Uppercase once and index by it, so point lookups are O(1)
+                # (.loc[t]); the column is kept for merge-based consumers.
                 df[index_col] = df[index_col].astype(str).str.upper()
+                df = df.set_index(index_col, drop=False)
             return df
         except Exception:
             return None
@@ -83,137 +131,178 @@ def read_macro_overrides(path="macro_overrides.json"):
 
 # ------------------------- Universe -------------------------
 
-u = pd.read_csv("tickers.csv")
+u = pacsv.read_csv("tickers.csv", convert_options=pacsv.ConvertOptions(
+    column_types={"ticker": pa.string(), "region": pa.string(), "notes": pa.string()}
+)).to_pandas()
 u["ticker"] = u["ticker"].astype(str).str.upper()
 
 # Optional IP data
-pat = load_optional_csv("patents.csv")
+pat = load_optional_csv("patents.csv", column_types={
+    "ticker": pa.string(), "patent_count": pa.int64(),
+    "forward_citations": pa.int64(), "rd_to_sales": pa.float64(),
+})
 
 # Optional macro overrides
 macro_ovr = read_macro_overrides()
 
 # ------------------------- Macro proxies (Soros) -------------------------
 # We fetch simple proxies via yfinance. If overrides exist, we use them.
+# One batched download for all proxies instead of four sequential history() calls.
+MACRO_TICKERS = ["^TNX", "DX-Y.NYB", "^DXY", "CL=F", "GC=F"]
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        _macro_px = yf.download(MACRO_TICKERS, period="1mo", interval="1d",
+                                threads=True, progress=False, session=session)["Close"]
+except Exception:
+    _macro_px = pd.DataFrame()
+
 def get_macro_proxy(ticker, fallback=None):
-    try:
-        px = yf.Ticker(ticker).history(period="1mo", interval="1d")["Close"]
-        if px.empty: return fallback
-        return float(px.iloc[-1])
-    except Exception:
+    if ticker not in _macro_px.columns:
         return fallback
+    px = _macro_px[ticker].dropna()
+    if px.empty: return fallback
+    return float(px.iloc[-1])
 
 ten_year = macro_ovr.get("ten_year_yield", None)  # e.g., 0.042 (=4.2%)
 if ten_year is None:
     # ^TNX prints 10-yr yield * 100; divide by 100 to get decimal
-    try:
-        tnx = get_macro_proxy("^TNX", None)
-        ten_year = (tnx/100.0) if tnx is not None else np.nan
-    except Exception:
-        ten_year = np.nan
+    tnx = get_macro_proxy("^TNX", None)
+    ten_year = (tnx/100.0) if tnx is not None else np.nan
 
 usd_dxy = macro_ovr.get("usd_dxy", get_macro_proxy("DX-Y.NYB", get_macro_proxy("^DXY", np.nan)))
 wti = macro_ovr.get("wti", get_macro_proxy("CL=F", np.nan))
 gold = macro_ovr.get("gold", get_macro_proxy("GC=F", np.nan))
 
-# ------------------------- Collect metrics per ticker -------------------------
+# ------------------------- Fetch stage (async fan-out) -------------------------
+# yfinance calls are blocking, so each ticker's fetches run in a worker thread;
+# the semaphore keeps at most CONCURRENCY_LIMIT tickers in flight at once.
+
+# The only info fields compute_row reads. The quoteSummary endpoint behind
+# tk.get_info() needs Yahoo's cookie+crumb handshake, so we go through
+# yfinance's authenticated data layer and slim the result down to these keys.
+INFO_FIELDS = ("currentPrice", "regularMarketPrice", "marketCap",
+               "trailingPE", "forwardPE", "dividendYield",
+               "earningsGrowth", "trailingEps", "sector")
+
+def _fetch_payloads(t):
+    """All network I/O for one ticker. Returns raw yfinance objects; no pandas math here."""
+    tk = yf.Ticker(t, session=session)
+    p = {}
+    # fast_info is the cheap endpoint: primary source for price/mcap.
+    # Individual fields occasionally raise, so each key is guarded.
+    fast = {}
+    try:
+        fi = tk.fast_info
+        for out_key, fi_key in (("price", "lastPrice"), ("market_cap", "marketCap")):
+            try:
+                fast[out_key] = fi[fi_key]
+            except Exception:
+                pass
+    except Exception:
+        pass
+    p["fast"] = fast
+    # info is only consulted for what fast_info doesn't carry (PE, growth,
+    # EPS, sector, dividend yield) plus price/mcap fallbacks; a failure here
+    # is loud, not silent — the Lynch/Soros inputs depend on these fields
+    try:
+        info = tk.get_info() or {}
+    except Exception as e:
+        print(f"warning: info fetch failed for {t}: {e}", file=sys.stderr)
+        info = {}
+    p["info"] = {k: info.get(k) for k in INFO_FIELDS}
+    p["cf"] = tk.cashflow
+    p["is"] = tk.income_stmt
+    p["bs"] = tk.balance_sheet
+    try:
+        p["qcf"] = tk.quarterly_cashflow
+    except Exception:
+        p["qcf"] = None
+    try:
+        p["shares"] = tk.get_shares_full(start=dt.date.today().replace(year=dt.date.today().year-3))
+    except Exception:
+        p["shares"] = None
+    return p
 
-rows = []
-today = dt.date.today().isoformat()
+async def fetch_ticker(sym, sem):
+    async with sem:
+        return sym, await asyncio.to_thread(_fetch_payloads, sym)
+
+async def fetch_all(symbols):
+    sem = asyncio.Semaphore(CONCURRENCY_LIMIT)
+    pairs = await asyncio.gather(*(fetch_ticker(s, sem) for s in symbols))
+    return dict(pairs)
 
-for _, row in u.iterrows():
-    t = row["ticker"]
-    region = row.get("region", "")
-    notes = row.get("notes", "")
+# ------------------------- Compute metrics per ticker -------------------------
 
-    tk = yf.Ticker(t)
-    info = tk.info or {}
+today = dt.date.today().isoformat()
+
+# Column order of the tuples returned by compute_row. String columns live in
+# object arrays; everything else stays in contiguous float64 buffers (SoA),
+# so DataFrame construction just wraps the arrays instead of hashing N dicts.
+ROW_FIELDS = ("date", "ticker", "region", "notes",
+              "price", "market_cap", "pe", "div_yield",
+              "revenue_ttm", "ebit_ttm", "fcf_ttm",
+              "ebit_margin", "fcf_margin", "fcf_yield",
+              "roic_est", "interest_coverage", "net_debt",
+              "growth_analyst", "rev_y0", "rev_y1", "rev_y2", "rev_y3",
+              "cash_to_mcap", "p_to_fcf", "shares_chg_3y",
+              "sector")
+STR_FIELDS = {"date", "ticker", "region", "notes", "sector"}
+
+def compute_row(t, region, notes, p):
+    """Pure pandas/numpy work on prefetched payloads for one ticker."""
+    info = p["info"]
 
     # -------- Prices & basic valuation --------
-    price = info.get("currentPrice") or info.get("regularMarketPrice")
-    mcap  = info.get("marketCap")
+    price = as_float(p["fast"].get("price") or info.get("currentPrice") or info.get("regularMarketPrice"))
+    mcap  = as_float(p["fast"].get("market_cap") or info.get("marketCap"))
     pe    = info.get("trailingPE") or info.get("forwardPE")
     div_y = info.get("dividendYield")  # decimal, e.g., 0.015 for 1.5%
 
-    # -------- Price history for Simons-style anomaly metrics --------
-    hist = tk.history(period="3y", interval="1d")
-    if hist is None or hist.empty:
-        weekly_ac = np.nan; vol_clust = np.nan; ret_pred = np.nan
-    else:
-        wk = hist["Close"].resample("W-FRI").last().dropna()
-        wk_ret = wk.pct_change().dropna()
-
-        # Autocorrelation of weekly returns (lag-1)
-        weekly_ac = series_autocorr(wk_ret, lag=1)
-
-        # Volatility clustering: autocorr of squared returns
-        vol_clust = series_autocorr((wk_ret**2), lag=1)
-
-        # Simple predictability proxy: |mean return| / std dev (Sharpe-like without rf)
-        ret_pred = abs(wk_ret.mean()) / (wk_ret.std()+1e-12)
-
-    # -------- Financial statements --------
-    cf = tk.cashflow
-    is_ = tk.income_stmt
-    bs_ = tk.balance_sheet
+    # -------- Financial statements (dicts of numpy arrays) --------
+    cf_a = stmt_arrays(p["cf"])
+    is_a = stmt_arrays(p["is"])
+    bs_a = stmt_arrays(p["bs"])
+    qcf_a = stmt_arrays(p["qcf"])
 
     # TTM FCF approximation (quarterly preferred)
-    try:
-        qcf = tk.quarterly_cashflow
-        ocf = qcf.loc["Total Cash From Operating Activities"].iloc[:4].sum()
-        capex = qcf.loc["Capital Expenditures"].iloc[:4].sum()
-    except Exception:
-        try:
-            ocf = cf.loc["Total Cash From Operating Activities"].iloc[0]
-            capex = cf.loc["Capital Expenditures"].iloc[0]
-        except Exception:
-            ocf, capex = np.nan, np.nan
+    if "Total Cash From Operating Activities" in qcf_a and "Capital Expenditures" in qcf_a:
+        ocf = float(np.nansum(qcf_a["Total Cash From Operating Activities"][:4]))
+        capex = float(np.nansum(qcf_a["Capital Expenditures"][:4]))
+    else:
+        ocf = stmt_val(cf_a, "Total Cash From Operating Activities")
+        capex = stmt_val(cf_a, "Capital Expenditures")
     fcf = (ocf or 0) - (capex or 0)
 
     # Revenue, EBIT, interest expense for coverage
-    try:
-        rev = is_.loc["Total Revenue"].iloc[0]
-    except Exception:
-        rev = np.nan
-    try:
-        ebit = is_.loc["Ebit"].iloc[0]
-    except Exception:
-        ebit = np.nan
-    try:
-        interest_exp = is_.loc["Interest Expense"].iloc[0]
-    except Exception:
-        interest_exp = np.nan
+    rev = stmt_val(is_a, "Total Revenue")
+    ebit = stmt_val(is_a, "Ebit")
+    interest_exp = stmt_val(is_a, "Interest Expense")
 
     # Balance sheet components for invested capital (use average of two periods if possible)
-    try:
-        ta_now = bs_.loc["Total Assets"].iloc[0]
-        cl_now = bs_.loc["Total Current Liabilities"].iloc[0]
-        cash_now = bs_.loc.get("Cash And Cash Equivalents", pd.Series([np.nan])).iloc[0]
-        sti_now = bs_.loc.get("Short Term Investments", pd.Series([0])).iloc[0]
-        gw_now  = bs_.loc.get("Goodwill", pd.Series([0])).iloc[0]
-        intang_now = bs_.loc.get("Intangible Assets", pd.Series([0])).iloc[0]
-    except Exception:
-        ta_now=cl_now=cash_now=sti_now=gw_now=intang_now=np.nan
-
-    try:
-        ta_prev = bs_.loc["Total Assets"].iloc[1]
-        cl_prev = bs_.loc["Total Current Liabilities"].iloc[1]
-        cash_prev = bs_.loc.get("Cash And Cash Equivalents", pd.Series([np.nan, np.nan])).iloc[1]
-        sti_prev = bs_.loc.get("Short Term Investments", pd.Series([0,0])).iloc[1]
-        gw_prev  = bs_.loc.get("Goodwill", pd.Series([0,0])).iloc[1]
-        intang_prev = bs_.loc.get("Intangible Assets", pd.Series([0,0])).iloc[1]
-    except Exception:
-        ta_prev=cl_prev=cash_prev=sti_prev=gw_prev=intang_prev=np.nan
-
-    def invested_cap(ta, cl, cash, sti, gw, inta):
-        if all(pd.isna([ta, cl])): return np.nan
-        # Conservative operating IC: TA - CL - (Cash+STI) - (Goodwill+Intangibles)
-        cashlike = (cash or 0) + (sti or 0)
-        soft = (gw or 0) + (inta or 0)
-        return (ta - cl) - cashlike - soft
+    ta_now = stmt_val(bs_a, "Total Assets")
+    cl_now = stmt_val(bs_a, "Total Current Liabilities")
+    cash_now = stmt_val(bs_a, "Cash And Cash Equivalents")
+    sti_now = stmt_val(bs_a, "Short Term Investments")
+    gw_now  = stmt_val(bs_a, "Goodwill")
+    intang_now = stmt_val(bs_a, "Intangible Assets")
+
+    ta_prev = stmt_val(bs_a, "Total Assets", 1)
+    cl_prev = stmt_val(bs_a, "Total Current Liabilities", 1)
+    cash_prev = stmt_val(bs_a, "Cash And Cash Equivalents", 1)
+    sti_prev = stmt_val(bs_a, "Short Term Investments", 1)
+    gw_prev  = stmt_val(bs_a, "Goodwill", 1)
+    intang_prev = stmt_val(bs_a, "Intangible Assets", 1)
 
     ic_now  = invested_cap(ta_now, cl_now, cash_now, sti_now, gw_now, intang_now)
     ic_prev = invested_cap(ta_prev, cl_prev, cash_prev, sti_prev, gw_prev, intang_prev)
-    ic_avg  = np.nanmean([ic_now, ic_prev])
+    # NaN-aware two-element mean, inlined: np.nanmean on a list pays for an
+    # array allocation plus ufunc dispatch per ticker (x == x is the NaN test)
+    if ic_now == ic_now and ic_prev == ic_prev:
+        ic_avg = 0.5 * (ic_now + ic_prev)
+    else:
+        ic_avg = ic_now if ic_now == ic_now else ic_prev
 
     # ROIC with NOPAT = EBIT * (1 - tax rate). Use fallback flat tax 21% if not available.
     tax_rate = 0.21
@@ -221,124 +310,169 @@ for _, row in u.iterrows():
     roic = safe_div(nopat, ic_avg)
 
     # Ratios
-    fcf_yield   = safe_div(fcf, mcap)
-    fcf_margin  = safe_div(fcf, rev)
+    fcf_yield   = safe_div(as_float(fcf), mcap)
+    fcf_margin  = safe_div(as_float(fcf), rev)
     ebit_margin = safe_div(ebit, rev)
-    net_debt = None
-    try:
-        tot_debt = bs_.loc.get("Total Debt", pd.Series([np.nan])).iloc[0]
-        net_debt = (tot_debt or 0) - (cash_now or 0)
-    except Exception:
-        net_debt = np.nan
+    tot_debt = stmt_val(bs_a, "Total Debt")
+    net_debt = (tot_debt or 0) - (cash_now or 0)
 
     # Interest coverage = EBIT / |Interest expense|
-    int_cov = safe_div(ebit, abs(interest_exp) if pd.notna(interest_exp) else np.nan)
+    int_cov = safe_div(ebit, abs(interest_exp))
 
-    # ---------------- Lynch PEG/PEGY with fallbacks ----------------
-    # Try analyst growth (info['earningsGrowth']); else compute 3y revenue CAGR
-    growth = info.get("earningsGrowth")
+    # ---------------- Lynch growth inputs ----------------
+    # Analyst growth plus the last 4 annual revenues (latest first, NaN-padded);
+    # the CAGR/PEG/PEGY math runs vectorized over the whole universe post-loop.
+    growth_analyst = as_float(info.get("earningsGrowth"))
 
-    try:
-        # Build 4-year revenue series (annual)
-        if is_ is not None and not is_.empty:
-            rev_hist = is_.loc["Total Revenue"].iloc[:4].dropna()
-            if len(rev_hist) >= 2:
-                years = len(rev_hist) - 1
-                # conservative: use earliest vs latest
-                growth_rev = cagr(rev_hist.iloc[-1*years], rev_hist.iloc[0], years)
-            else:
-                growth_rev = np.nan
-        else:
-            growth_rev = np.nan
-    except Exception:
-        growth_rev = np.nan
+    rev_arr = is_a.get("Total Revenue")
+    rev_y = [np.nan] * 4
+    if rev_arr is not None:
+        vals = [v for v in (as_float(x) for x in rev_arr[:4]) if not np.isnan(v)]
+        rev_y[:len(vals)] = vals
 
-    if growth is None or pd.isna(growth):
-        growth = growth_rev
-
-    # PEG and PEGY (use trailing P/E; if missing, compute P/E with EPS approximate)
+    # Effective trailing P/E; if missing, approximate via EPS
     pe_eff = pe
     if (pe_eff is None or pd.isna(pe_eff)) and info.get("trailingEps"):
         eps = info.get("trailingEps")
-        pe_eff = safe_div(price, eps)
-
-    # Ensure growth is decimal; avoid non-positive
-    g = growth if (growth is not None and not pd.isna(growth)) else np.nan
-    if g is not np.nan and g is not None and g <= 0:
-        g = np.nan
-
-    PEG = np.nan
-    if pe_eff and g:
-        # Classic Lynch: P/E divided by growth in %
-        if g < 1:
-            PEG = pe_eff / (g*100.0)
-        else:
-            PEG = pe_eff / g
-
-    div_pct = (div_y or 0)*100.0 if div_y and div_y < 1 else div_y  # convert to %
-    PEGY = None
-    if pd.notna(pe_eff) and pd.notna(g):
-        denom = (g*100.0 if g and g < 1 else g)
-        denom += (div_pct or 0)
-        PEGY = safe_div(pe_eff, denom)
+        pe_eff = safe_div(price, as_float(eps))
 
     # ---------------- Icahn-style activist unlock proxies ----------------
-    try:
-        shares = tk.get_shares_full(start=dt.date.today().replace(year=dt.date.today().year-3))
-        shares = shares.dropna()
-        shr_change = pct_change(shares.iloc[0], shares.iloc[-1]) if len(shares) >= 2 else np.nan
-    except Exception:
+    shares = p["shares"].dropna() if p["shares"] is not None else None
+    if shares is not None and len(shares) >= 2:
+        shr_change = pct_change(as_float(shares.iloc[0]), as_float(shares.iloc[-1]))
+    else:
         shr_change = np.nan
 
-    try:
-        cash_eq = bs_.loc["Cash And Cash Equivalents"].iloc[0]
-    except Exception:
-        cash_eq = np.nan
-    cash_to_mcap = safe_div(cash_eq, mcap)
+    cash_to_mcap = safe_div(cash_now, mcap)
         # Price-to-FCF (lower is better); guard against missing/negative FCF
     if pd.notna(fcf) and fcf > 0:
-        p_to_fcf = safe_div(mcap, fcf)
+        p_to_fcf = safe_div(mcap, as_float(fcf))
     else:
         p_to_fcf = np.nan
 
-    # ---------------- Soros macro-stress proxies ----------------
-    sector = (info.get("sector") or "").lower()
-    cyclical = any(k in sector for k in ["financial", "materials", "industr", "energy", "discretionary"])
-    rate_sensitive = ("financial" in sector) or (net_debt and net_debt > 0)
-    fx_sensitive = ("materials" in sector or "industr" in sector or "technology" in sector)
-
-    macro_sensitivity = sum([
-        1.0 if cyclical else 0.0,
-        1.0 if rate_sensitive else 0.0,
-        1.0 if fx_sensitive else 0.0
-    ])
-
-    # ---------------- Simons quant-edge proxies already computed ----------------
-
-    # ---------------- Optional IP/Patents merge ----------------
-    patent_count = forward_cit = rd_to_sales = np.nan
-    if pat is not None:
-        rec = pat[pat["ticker"].str.upper()==t]
-        if not rec.empty:
-            patent_count = rec["patent_count"].iloc[0] if "patent_count" in rec.columns else np.nan
-            forward_cit  = rec["forward_citations"].iloc[0] if "forward_citations" in rec.columns else np.nan
-            rd_to_sales  = rec["rd_to_sales"].iloc[0] if "rd_to_sales" in rec.columns else np.nan
-
-    rows.append({
-        "date": today, "ticker": t, "region": region, "notes": notes,
-        "price": price, "market_cap": mcap, "pe": pe_eff, "div_yield": div_y,
-        "revenue_ttm": rev, "ebit_ttm": ebit, "fcf_ttm": fcf,
-        "ebit_margin": ebit_margin, "fcf_margin": fcf_margin, "fcf_yield": fcf_yield,
-        "roic_est": roic, "interest_coverage": int_cov, "net_debt": net_debt,
-        "PEG": PEG, "PEGY": PEGY, "growth_proxy": g,
-        "cash_to_mcap": cash_to_mcap, "p_to_fcf": p_to_fcf, "shares_chg_3y": shr_change,
-        "weekly_ac": weekly_ac, "vol_clust": vol_clust, "ret_pred": ret_pred,
-        "macro_sensitivity": macro_sensitivity,
-        "patent_count": patent_count, "forward_citations": forward_cit, "rd_to_sales": rd_to_sales,
-        "sector": info.get("sector")
-    })
-
-df = pd.DataFrame(rows)
+    # Tuple ordered like ROW_FIELDS; filled into the preallocated column buffers
+    return (today, t, region, notes,
+            price, mcap, pe_eff, div_y,
+            rev, ebit, fcf,
+            ebit_margin, fcf_margin, fcf_yield,
+            roic, int_cov, net_debt,
+            growth_analyst, rev_y[0], rev_y[1], rev_y[2], rev_y[3],
+            cash_to_mcap, p_to_fcf, shr_change,
+            info.get("sector"))
+
+# yfinance and the wide resample/pct_change are chatty with
+# Future/PerformanceWarnings; silence them only around the fetch+compute
+# stage instead of process-wide.
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    # One batched, thread-pooled download for all price histories instead of
+    # one chart request per ticker; slice per ticker from the MultiIndex frame.
+    prices = yf.download(tickers=u["ticker"].tolist(), period="3y", interval="1d",
+                         group_by="ticker", threads=True, auto_adjust=False,
+                         progress=False, session=session)
+
+    # ---- Simons-style anomaly metrics, vectorized across the whole universe ----
+    # One resample/pct_change on the wide (weeks x tickers) frame replaces N
+    # per-ticker Series constructions and scalar autocorr calls.
+    if prices.empty:
+        weekly_ac = vol_clust = ret_pred = pd.Series(dtype=float)
+    else:
+        if isinstance(prices.columns, pd.MultiIndex):
+            close_wide = prices.xs("Close", level=1, axis=1)
+        else:
+            # single-ticker universe: yf.download returns flat columns
+            close_wide = prices[["Close"]].set_axis(u["ticker"].tolist()[:1], axis=1)
+        wk = close_wide.resample("W-FRI").last()
+        wk_ret = wk.pct_change().dropna(how="all")
+
+        # Lag-1 autocorrelation of weekly returns, per ticker
+        weekly_ac = wk_ret.corrwith(wk_ret.shift(1))
+
+        # Volatility clustering: autocorr of squared returns
+        vol_clust = (wk_ret**2).corrwith((wk_ret**2).shift(1))
+
+        # Simple predictability proxy: |mean return| / std dev (Sharpe-like without rf)
+        ret_pred = wk_ret.mean().abs() / (wk_ret.std() + 1e-12)
+
+    # Fan out the remaining network I/O, then do the pandas work locally
+    payloads = asyncio.run(fetch_all(u["ticker"].tolist()))
+
+    N = len(u)
+    cols = {f: (np.empty(N, dtype=object) if f in STR_FIELDS else np.full(N, np.nan))
+            for f in ROW_FIELDS}
+
+    # compute_row is pure CPU over local payloads, so fan it out across cores.
+    # The fork context lets workers inherit module state (helpers, today)
+    # without re-importing this script.
+    tickers = u["ticker"].tolist()
+    regions = u["region"].tolist() if "region" in u.columns else [""] * N
+    notes_l = u["notes"].tolist() if "notes" in u.columns else [""] * N
+    with ProcessPoolExecutor(mp_context=mp.get_context("fork")) as ex:
+        results = list(ex.map(compute_row, tickers, regions, notes_l,
+                              (payloads[t] for t in tickers), chunksize=16))
+    for i, vals in enumerate(results):
+        for f, v in zip(ROW_FIELDS, vals):
+            if f in STR_FIELDS:
+                cols[f][i] = v
+            elif v is not None:
+                cols[f][i] = v
+
+df = pd.DataFrame(cols)
+df["weekly_ac"] = df["ticker"].map(weekly_ac)
+df["vol_clust"] = df["ticker"].map(vol_clust)
+df["ret_pred"] = df["ticker"].map(ret_pred)
+
+# ---- Lynch PEG/PEGY with fallbacks, vectorized across the universe ----
+# One ufunc pass over the stacked (N x 4) revenue histories replaces the
+# per-ticker cagr() calls: CAGR from earliest to latest available year.
+rev_hist_arr = df[["rev_y0", "rev_y1", "rev_y2", "rev_y3"]].to_numpy(dtype=np.float64)
+n_years = np.count_nonzero(~np.isnan(rev_hist_arr), axis=1) - 1
+latest = rev_hist_arr[:, 0]
+earliest = rev_hist_arr[np.arange(len(df)), np.maximum(n_years, 0)]
+with np.errstate(invalid="ignore", divide="ignore"):
+    growth_rev = np.where((earliest > 0) & (n_years > 0),
+                          (latest / earliest) ** (1.0 / np.maximum(n_years, 1)) - 1.0,
+                          np.nan)
+
+    # Prefer analyst growth; ensure it's positive (PEG is meaningless otherwise)
+    g = df["growth_analyst"].to_numpy(dtype=np.float64)
+    g = np.where(np.isnan(g), growth_rev, g)
+    g = np.where(g <= 0, np.nan, g)
+
+    # Classic Lynch: P/E divided by growth in % (decimal growth scaled by 100)
+    pe_eff = pd.to_numeric(df["pe"], errors="coerce").to_numpy(dtype=np.float64)
+    gpct = np.where(g < 1, g * 100.0, g)
+    div_y_arr = pd.to_numeric(df["div_yield"], errors="coerce").to_numpy(dtype=np.float64)
+    div_pct = np.where(div_y_arr < 1, div_y_arr * 100.0, div_y_arr)  # convert to %
+    df["growth_proxy"] = g
+    df["PEG"] = pe_eff / gpct
+    df["PEGY"] = pe_eff / (gpct + np.nan_to_num(div_pct))
+
+df = df.drop(columns=["growth_analyst", "rev_y0", "rev_y1", "rev_y2", "rev_y3"])
+
+# ---- Soros macro-stress proxies, vectorized over the sector strings ----
+sec = df["sector"].str.lower().fillna("")
+cyclical = sec.str.contains("financial|materials|industr|energy|discretionary", regex=True)
+rate_sensitive = sec.str.contains("financial") | (df["net_debt"] > 0)
+fx_sensitive = sec.str.contains("materials|industr|technology", regex=True)
+df["macro_sensitivity"] = (cyclical.astype(float) + rate_sensitive.astype(float)
+                           + fx_sensitive.astype(float))
+
+# ---- Optional IP/Patents merge: one hash join instead of a scan per ticker ----
+if pat is not None:
+    ip_cols = [c for c in ("patent_count", "forward_citations", "rd_to_sales")
+               if c in pat.columns]
+    # reset the ticker index so the merge key isn't ambiguous with the column
+    df = df.merge(pat[["ticker"] + ip_cols].reset_index(drop=True),
+                  on="ticker", how="left")
+for c in ("patent_count", "forward_citations", "rd_to_sales"):
+    if c not in df.columns:
+        df[c] = np.nan
+
+# Low-cardinality strings as categoricals: int8/int16 codes instead of one
+# PyObject per row, which also speeds up sorting and the Parquet write
+for c in ("region", "sector", "notes"):
+    df[c] = df[c].astype("category")
 
 # ------------------------- Build sub-scores per investor -------------------------
 
@@ -349,61 +483,73 @@ def zscore(s):
 def pos_clip(s):  # map z to 0..100
     return 100*(s - np.nanmin(s))/(np.nanmax(s)-np.nanmin(s) + 1e-9)
 
-# Buffett Quality: ROIC, FCF margin, FCF yield, EBIT margin, low leverage, coverage
-df["buffett_raw"] = (
-    0.35*zscore(df["roic_est"]) +
-    0.20*zscore(df["fcf_margin"]) +
-    0.15*zscore(df["fcf_yield"]) +
-    0.15*zscore(df["ebit_margin"]) +
-    0.10*(-zscore(df["net_debt"])) +   # lower net debt better
-    0.05*zscore(df["interest_coverage"])
-)
-df["buffett_score"] = pos_clip(df["buffett_raw"])
-
-# Lynch GARP: inverse PEG/PEGY (lower better), growth, low debt
-inv_PEG = 1/(df["PEG"]+1e-9)
-inv_PEGY = 1/(df["PEGY"]+1e-9)
-df["lynch_raw"] = (
-    0.35*zscore(inv_PEG) +
-    0.25*zscore(inv_PEGY) +
-    0.25*zscore(df["growth_proxy"]) +
-    0.15*(-zscore(df["net_debt"]))
-)
-df["lynch_score"] = pos_clip(df["lynch_raw"])
-
-# Icahn Activist Unlock: cash_to_mcap high, p_to_fcf low, shares_chg negative (buybacks), leverage not extreme
-inv_p_to_fcf = 1/(df["p_to_fcf"]+1e-9)
-df["icahn_raw"] = (
-    0.35*zscore(df["cash_to_mcap"]) +
-    0.35*zscore(inv_p_to_fcf) +
-    0.20*(-zscore(df["shares_chg_3y"])) +  # more negative (shrinking shares) is better
-    0.10*(-zscore(df["net_debt"]))
-)
-df["icahn_score"] = pos_clip(df["icahn_raw"])
-
-# Soros Macro-Stress: cheap on FCF + high macro sensitivity (+ coverage)
-df["soros_raw"] = (
-    0.50*zscore(inv_p_to_fcf) +           # cheap on FCF = upside if macro flips
-    0.30*zscore(df["macro_sensitivity"]) +# higher sensitivity => bigger reflexive moves
-    0.20*zscore(df["interest_coverage"])  # ability to survive rates
-)
-df["soros_score"] = pos_clip(df["soros_raw"])
-
-# Simons Quant-Edge: autocorr, vol clustering, return predictability
-df["simons_raw"] = (
-    0.34*zscore(df["weekly_ac"]) +
-    0.33*zscore(df["vol_clust"]) +
-    0.33*zscore(df["ret_pred"])
-)
-df["simons_score"] = pos_clip(df["simons_raw"])
+# All five sub-scores come from one standardized metric matrix: z-score every
+# metric column in a single nanmean/nanstd pass, then combine per investor with
+# a signed weight matrix (negative weight = lower is better). That is one pass
+# over memory instead of ~20 separate zscore() calls.
+# Lower PEG/PEGY/P-FCF are better, so score their inverses. pd.eval fuses the
+# expression into one kernel over the (N x 3) block (numexpr-backed when
+# installed) instead of allocating a temporary per ratio.
+inv = pd.eval("1.0 / (v + 1e-9)",
+              local_dict={"v": df[["PEG", "PEGY", "p_to_fcf"]].to_numpy(dtype=np.float64)})
+df[["inv_PEG", "inv_PEGY", "inv_p_to_fcf"]] = inv
+
+SCORE_METRICS = ["roic_est", "fcf_margin", "fcf_yield", "ebit_margin", "net_debt",
+                 "interest_coverage", "inv_PEG", "inv_PEGY", "growth_proxy",
+                 "cash_to_mcap", "inv_p_to_fcf", "shares_chg_3y",
+                 "weekly_ac", "vol_clust", "ret_pred", "macro_sensitivity"]
+SCORE_NAMES = ["buffett_score", "lynch_score", "icahn_score", "soros_score", "simons_score"]
+
+# Rows follow SCORE_METRICS, columns follow SCORE_NAMES
+SCORE_WEIGHTS = np.array([
+    # buffett lynch  icahn  soros  simons
+    [0.35,    0.00,  0.00,  0.00,  0.00],   # roic_est
+    [0.20,    0.00,  0.00,  0.00,  0.00],   # fcf_margin
+    [0.15,    0.00,  0.00,  0.00,  0.00],   # fcf_yield
+    [0.15,    0.00,  0.00,  0.00,  0.00],   # ebit_margin
+    [-0.10,  -0.15, -0.10,  0.00,  0.00],   # net_debt (lower is better)
+    [0.05,    0.00,  0.00,  0.20,  0.00],   # interest_coverage
+    [0.00,    0.35,  0.00,  0.00,  0.00],   # inv_PEG
+    [0.00,    0.25,  0.00,  0.00,  0.00],   # inv_PEGY
+    [0.00,    0.25,  0.00,  0.00,  0.00],   # growth_proxy
+    [0.00,    0.00,  0.35,  0.00,  0.00],   # cash_to_mcap
+    [0.00,    0.00,  0.35,  0.50,  0.00],   # inv_p_to_fcf (cheap on FCF)
+    [0.00,    0.00, -0.20,  0.00,  0.00],   # shares_chg_3y (buybacks shrink shares)
+    [0.00,    0.00,  0.00,  0.00,  0.34],   # weekly_ac
+    [0.00,    0.00,  0.00,  0.00,  0.33],   # vol_clust
+    [0.00,    0.00,  0.00,  0.00,  0.33],   # ret_pred
+    [0.00,    0.00,  0.00,  0.30,  0.00],   # macro_sensitivity (bigger reflexive moves)
+])
+
+M = df[SCORE_METRICS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+with warnings.catch_warnings():
+    # all-NaN metric columns are expected (e.g. PEGY on a dividend-free
+    # universe); the scores stay NaN for them
+    warnings.simplefilter("ignore", RuntimeWarning)
+    Z = (M - np.nanmean(M, axis=0)) / (np.nanstd(M, axis=0) + 1e-9)
+
+    raw = np.empty((len(df), len(SCORE_NAMES)))
+    for j in range(len(SCORE_NAMES)):
+        w = SCORE_WEIGHTS[:, j]
+        used = w != 0.0
+        # restrict the product to metrics the score uses, so a NaN in an unused
+        # metric doesn't poison this score
+        raw[:, j] = Z[:, used] @ w[used]
+
+    lo = np.nanmin(raw, axis=0)
+    hi = np.nanmax(raw, axis=0)
+    scores = 100 * (raw - lo) / (hi - lo + 1e-9)
+df[SCORE_NAMES] = scores
 
 # Optional IP boost (applies to Buffett & Simons)
 if any(col in df.columns for col in ["patent_count","forward_citations","rd_to_sales"]):
-    ip_z = (
-        0.50*zscore(df["patent_count"]) +
-        0.30*zscore(df["forward_citations"]) +
-        0.20*zscore(df["rd_to_sales"])
-    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN IP columns
+        ip_z = (
+            0.50*zscore(df["patent_count"]) +
+            0.30*zscore(df["forward_citations"]) +
+            0.20*zscore(df["rd_to_sales"])
+        )
     df["buffett_score"] = np.where(np.isnan(ip_z), df["buffett_score"], df["buffett_score"]*0.9 + pos_clip(ip_z)*0.1)
     df["simons_score"]  = np.where(np.isnan(ip_z), df["simons_score"],  df["simons_score"]*0.9  + pos_clip(ip_z)*0.1)
 
@@ -417,8 +563,8 @@ df["meta_score"] = (
 )
 
 # Quality & Cash flags (from v1, retained)
-df["quality_flag"] = (df["roic_est"]>=0.15) & (df["ebit_margin"]>=0.15)
-df["cash_flag"] = (df["fcf_margin"]>=0.10) | (df["fcf_yield"]>=0.05)
+df["quality_flag"] = ((df["roic_est"]>=0.15) & (df["ebit_margin"]>=0.15)).astype("boolean")
+df["cash_flag"] = ((df["fcf_margin"]>=0.10) | (df["fcf_yield"]>=0.05)).astype("boolean")
 
 # ------------------------- Outputs -------------------------
 
@@ -432,9 +578,16 @@ out_cols = [
     "buffett_score","lynch_score","icahn_score","soros_score","simons_score","meta_score",
     "quality_flag","cash_flag"
 ]
-df[out_cols].sort_values("meta_score", ascending=False).to_csv(
-    os.path.join(OUT_DIR, "screen_results_v2.csv"), index=False
+# Canonical artifact is columnar Parquet: no per-value text formatting on
+# write, zstd keeps it small, and downstream re-reads are near-instant.
+results = df[out_cols].sort_values("meta_score", ascending=False)
+results.to_parquet(
+    os.path.join(OUT_DIR, "screen_results_v2.parquet"),
+    compression="zstd", index=False
 )
+# Human-readable CSV only on request: python screen_v2.py --csv
+if "--csv" in sys.argv:
+    results.to_csv(os.path.join(OUT_DIR, "screen_results_v2.csv"), index=False)
 
 # -------- EU number formatting (thousand '.' and decimal ',') --------
 def _fmt_num(x):
@@ -484,7 +637,8 @@ for sc in score_cols:
     df[sc] = df[sc].round(2)
 
 # Markdown summary
-top = df.sort_values("meta_score", ascending=False).head(20)
+# Heap-select the top 20 (O(N log 20)) instead of sorting the whole frame
+top = df.nlargest(20, "meta_score")
 md = top[[
     "ticker","region","sector","meta_score",
     "buffett_score","lynch_score","icahn_score","soros_score","simons_score",
@@ -515,5 +669,5 @@ Notes:
 with open(os.path.join(OUT_DIR, "factor_explain_v2.md"), "w", encoding="utf-8") as f:
     f.write(explain)
 
-print("Done. Wrote outputs/screen_results_v2.csv, screen_report_v2.md, factor_explain_v2.md")
+print("Done. Wrote outputs/screen_results_v2.parquet, screen_report_v2.md, factor_explain_v2.md")
 